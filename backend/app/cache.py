@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime
+import numpy
+import pandas
+import sklearn
+from sqlalchemy.orm import Session
+from . import models
+
+# Total budget for cached results; least recently used entries are evicted past it. 0 disables the cache.
+CACHE_MAX_BYTES = int(os.environ.get("TRAINING_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+
+# Any edit to the training or cloning code, or a library upgrade, invalidates every cached result
+_code_hash = hashlib.sha256()
+for _name in ("worker.py", "cache.py"):
+    with open(os.path.join(os.path.dirname(__file__), _name), "rb") as f:
+        _code_hash.update(f.read())
+CODE_VERSION = {
+    "source": _code_hash.hexdigest(),
+    "sklearn": sklearn.__version__,
+    "numpy": numpy.__version__,
+    "pandas": pandas.__version__,
+}
+
+# path -> (size, mtime_ns, sha256) so unchanged datasets are only hashed once; LRU-bounded
+_DATASET_HASHES_MAX = 256
+_dataset_hashes = OrderedDict()
+
+def dataset_hash(path: str) -> str:
+    """
+    Content hash of a dataset file, memoized on size + mtime.
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    memo = _dataset_hashes.get(path)
+    if memo and memo[0] == st.st_size and memo[1] == st.st_mtime_ns:
+        _dataset_hashes.move_to_end(path)
+        return memo[2]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    _dataset_hashes[path] = (st.st_size, st.st_mtime_ns, digest)
+    _dataset_hashes.move_to_end(path)
+    while len(_dataset_hashes) > _DATASET_HASHES_MAX:
+        _dataset_hashes.popitem(last=False)
+    return digest
+
+def make_key(dataset_path: str, model_type: str, params: dict) -> str:
+    payload = json.dumps({
+        "dataset": dataset_hash(dataset_path),
+        "model": model_type,
+        "params": params,
+        "code": CODE_VERSION,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def lookup(db: Session, key: str):
+    if CACHE_MAX_BYTES <= 0:
+        return None
+    entry = db.query(models.TrainingCache).filter(models.TrainingCache.key == key).first()
+    if entry:
+        entry.hit_count += 1
+        entry.last_used_at = datetime.utcnow()
+        db.commit()
+    return entry
+
+def clone_into_run(db: Session, entry: models.TrainingCache, run: models.Run) -> models.Run:
+    """
+    Saves `run` as completed with the cached final metrics and metric history, in a single transaction.
+    """
+    run.status = "completed"
+    run.metrics = entry.metrics
+    db.add(run)
+    db.flush()
+    db.add_all([
+        models.MetricHistory(run_id=run.id, step=step, name=name, value=value)
+        for step, name, value in entry.history
+    ])
+    db.commit()
+    db.refresh(run)
+    return run
+
+def store(db: Session, key: str, dataset_path: str, model_type: str, params: dict, run: models.Run):
+    """
+    Saves a completed run's results under `key`, then evicts down to CACHE_MAX_BYTES.
+    `params` should be the same dict the key was built from.
+    """
+    if CACHE_MAX_BYTES <= 0:
+        return
+
+    rows = db.query(models.MetricHistory).filter(models.MetricHistory.run_id == run.id).order_by(models.MetricHistory.id).all()
+    history = [[m.step, m.name, m.value] for m in rows]
+    size = len(json.dumps(history)) + len(json.dumps(run.metrics))
+
+    entry = db.query(models.TrainingCache).filter(models.TrainingCache.key == key).first()
+    if not entry:
+        entry = models.TrainingCache(key=key, hit_count=0)
+        db.add(entry)
+    entry.model = model_type
+    entry.dataset_hash = dataset_hash(dataset_path)
+    entry.parameters = json.loads(json.dumps(params, default=str))
+    entry.metrics = run.metrics
+    entry.history = history
+    entry.size_bytes = size
+    entry.last_used_at = datetime.utcnow()
+    db.commit()
+
+    evict(db, CACHE_MAX_BYTES)
+
+def evict(db: Session, max_bytes: int):
+    total = 0
+    overflow = []
+    sizes = db.query(models.TrainingCache.id, models.TrainingCache.size_bytes).order_by(models.TrainingCache.last_used_at.desc())
+    for entry_id, size in sizes:
+        total += size or 0
+        if total > max_bytes:
+            overflow.append(entry_id)
+    if overflow:
+        db.query(models.TrainingCache).filter(models.TrainingCache.id.in_(overflow)).delete(synchronize_session=False)
+        db.commit()
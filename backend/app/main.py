@@ -91,7 +91,7 @@ def get_run_metrics(run_id: int, db: Session = Depends(get_db)):
 from fastapi import UploadFile, File, BackgroundTasks
 import shutil
 import os
-from . import worker
+from . import worker, cache
 
 DATA_DIR = "./datasets"
 os.makedirs(DATA_DIR, exist_ok=True)
@@ -115,6 +115,7 @@ class TrainRequest(BaseModel):
     dataset_filename: str
     model: str
     params: Dict[str, Any] = {}
+    force_retrain: bool = False # Skip the result cache and train from scratch
 
 class TrainRequest2(BaseModel):
      experiment_id: int
@@ -129,21 +130,33 @@ def start_training_job(req: TrainRequest, background_tasks: BackgroundTasks, db:
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="Dataset not found")
 
-    # 2. Create Run Entry
+    # 2. Check Result Cache (identical dataset + model + params + code)
+    result_key = worker.cache_key(file_path, req.model, req.params)
+    cached = None if req.force_retrain else cache.lookup(db, result_key)
+
+    # 3. Create Run Entry
     run_name = f"{req.model} on {req.dataset_filename}"
-    db_run = models.Run(
+    run_fields = dict(
         experiment_id=req.experiment_id,
         name=run_name,
-        status="running",
         parameters={"model": req.model, "dataset": req.dataset_filename, **req.params},
-        tags=["auto-web", req.model]
     )
+
+    if cached:
+        try:
+            return cache.clone_into_run(db, cached, models.Run(**run_fields, tags=["auto-web", req.model, "cached"]))
+        except Exception as e:
+            # Nothing was committed; fall back to training from scratch
+            db.rollback()
+            print(f"cache: could not clone cached result {result_key}: {e}")
+
+    db_run = models.Run(**run_fields, status="running", tags=["auto-web", req.model])
     db.add(db_run)
     db.commit()
     db.refresh(db_run)
     
-    # 3. Spawn Worker
-    background_tasks.add_task(worker.train_background_task, db_run.id, file_path, req.model, req.params)
+    # 4. Spawn Worker
+    background_tasks.add_task(worker.train_background_task, db_run.id, file_path, req.model, req.params, result_key)
     
     return db_run
 
@@ -155,3 +168,9 @@ def clear_data(db: Session = Depends(get_db)):
     db.query(models.Experiment).delete()
     db.commit()
     return {"status": "cleared"}
+
+@app.delete("/cache")
+def clear_cache(db: Session = Depends(get_db)):
+    db.query(models.TrainingCache).delete()
+    db.commit()
+    return {"status": "cleared"}
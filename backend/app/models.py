@@ -40,3 +40,18 @@ class MetricHistory(Base):
     timestamp = Column(DateTime, default=datetime.utcnow)
 
     run = relationship("Run", back_populates="metric_history")
+
+class TrainingCache(Base):
+    __tablename__ = "training_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String, unique=True, index=True) # sha256 of dataset + model + params + code version
+    model = Column(String)
+    dataset_hash = Column(String)
+    parameters = Column(JSON) # Merged DEFAULT_PARAMS + user params
+    metrics = Column(JSON) # Final metrics of the source run
+    history = Column(JSON) # [[step, name, value], ...]
+    size_bytes = Column(Integer, default=0)
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
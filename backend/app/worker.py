@@ -2,7 +2,7 @@ import pandas as pd
 import time
 import traceback
 from sqlalchemy.orm import Session
-from . import models, database
+from . import models, database, cache
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import f1_score, log_loss, precision_score, recall_score
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, AdaBoostClassifier
@@ -41,7 +41,40 @@ DEFAULT_PARAMS = {
     "AdaBoost": {"n_estimators": 50, "learning_rate": 1.0}
 }
 
-def train_background_task(run_id: int, dataset_path: str, model_type: str, hyperparams: dict):
+# Models trained epoch-by-epoch via warm_start
+ITERATIVE_MODELS = ["MLPClassifier", "SGDClassifier"]
+
+def resolve_params(model_type: str, hyperparams: dict) -> dict:
+    """
+    Merge defaults with user params. Models that take a random_state are seeded with 42
+    (unless the user passes their own) so the same params always train the same model.
+    """
+    final_params = DEFAULT_PARAMS.get(model_type, {}).copy()
+    if model_type in MODEL_REGISTRY and "random_state" in MODEL_REGISTRY[model_type]().get_params():
+        final_params["random_state"] = 42
+    if hyperparams:
+        final_params.update(hyperparams)
+    return final_params
+
+def cache_params(model_type: str, hyperparams: dict) -> dict:
+    """
+    Everything besides the dataset and code that determines a run's metrics.
+    """
+    final_params = resolve_params(model_type, hyperparams)
+    # The worker reads the epoch count of iterative models from the raw user params
+    # (default 50), not from the merged max_iter (default 500), so it is keyed separately
+    if model_type in ITERATIVE_MODELS:
+        final_params["epochs"] = hyperparams.get("max_iter", 50)
+    return final_params
+
+def cache_key(dataset_path: str, model_type: str, hyperparams: dict) -> str:
+    """
+    Key identifying a training result. Splits and models are seeded, so runs with the same key
+    on the same dataset contents, code and library versions produce the same metrics.
+    """
+    return cache.make_key(dataset_path, model_type, cache_params(model_type, hyperparams))
+
+def train_background_task(run_id: int, dataset_path: str, model_type: str, hyperparams: dict, result_key: str = None):
     """
     Background worker that loads data, trains model, logs metrics Live to DB.
     """
@@ -90,13 +123,10 @@ def train_background_task(run_id: int, dataset_path: str, model_type: str, hyper
             
         ModelClass = MODEL_REGISTRY[model_type]
         
-        # Merge defaults with user params
-        final_params = DEFAULT_PARAMS.get(model_type, {}).copy()
-        if hyperparams:
-            final_params.update(hyperparams)
+        final_params = resolve_params(model_type, hyperparams)
 
         # Special casing for partial_fit/warm_start support
-        supports_iterative = model_type in ["MLPClassifier", "SGDClassifier"]
+        supports_iterative = model_type in ITERATIVE_MODELS
         
         # Helper to log all metrics
         def log_step(m_model, m_step, X_t, y_t, X_tr, y_tr):
@@ -227,6 +257,14 @@ def train_background_task(run_id: int, dataset_path: str, model_type: str, hyper
         db.commit()
         print(f"worker: run {run_id} completed successfully")
 
+        if result_key:
+            try:
+                cache.store(db, result_key, dataset_path, model_type, cache_params(model_type, hyperparams), run)
+            except Exception as e:
+                # A cache failure must not fail an already completed run
+                db.rollback()
+                print(f"worker: could not cache run {run_id}: {e}")
+
     except Exception as e:
         print(f"worker: run {run_id} failed: {e}")
         traceback.print_exc()
@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# Importing app.main creates tables in ./ml_dashboard.db; keep that away from the checked-in database
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.chdir(tempfile.mkdtemp())
@@ -0,0 +1,111 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import cache, main, models, worker
+from app.database import Base
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b,target\n1,2,0\n3,4,1\n")
+    return str(path)
+
+def finished_run(db, metrics, history):
+    run = models.Run(experiment_id=1, name="source", status="completed", parameters={}, metrics=metrics)
+    db.add(run)
+    db.commit()
+    for step, name, value in history:
+        db.add(models.MetricHistory(run_id=run.id, step=step, name=name, value=value))
+    db.commit()
+    return run
+
+def test_store_then_lookup_hits_and_clones(db, dataset):
+    params = worker.cache_params("RandomForest", {"max_depth": 3})
+    key = cache.make_key(dataset, "RandomForest", params)
+    source = finished_run(db, {"final_accuracy": 0.9}, [(1, "test_accuracy", 0.8), (2, "test_accuracy", 0.85)])
+    cache.store(db, key, dataset, "RandomForest", params, source)
+
+    entry = cache.lookup(db, key)
+    assert entry is not None
+    assert entry.hit_count == 1
+    assert entry.parameters["random_state"] == 42
+
+    run = cache.clone_into_run(db, entry, models.Run(experiment_id=1, name="clone", parameters={}))
+    assert run.status == "completed"
+    assert run.metrics == {"final_accuracy": 0.9}
+    history = db.query(models.MetricHistory).filter(models.MetricHistory.run_id == run.id).all()
+    assert [(m.step, m.name, m.value) for m in history] == [(1, "test_accuracy", 0.8), (2, "test_accuracy", 0.85)]
+
+def test_changed_dataset_misses(db, dataset):
+    params = worker.cache_params("DecisionTree", {})
+    key = cache.make_key(dataset, "DecisionTree", params)
+    cache.store(db, key, dataset, "DecisionTree", params, finished_run(db, {"final_accuracy": 1.0}, []))
+
+    with open(dataset, "a") as f:
+        f.write("5,6,0\n")
+    new_key = cache.make_key(dataset, "DecisionTree", params)
+    assert new_key != key
+    assert cache.lookup(db, new_key) is None
+
+def test_key_covers_params_and_epochs(dataset):
+    assert worker.cache_key(dataset, "RandomForest", {}) != worker.cache_key(dataset, "RandomForest", {"max_depth": 3})
+    # max_iter=500 is the merged default, but the worker trains 50 epochs unless it is passed explicitly
+    assert worker.cache_key(dataset, "MLPClassifier", {}) != worker.cache_key(dataset, "MLPClassifier", {"max_iter": 500})
+    assert "random_state" not in worker.resolve_params("KNN", {})
+
+def test_eviction_drops_least_recently_used(db, dataset, monkeypatch):
+    run = finished_run(db, {"final_accuracy": 0.5}, [(1, "test_accuracy", 0.5)])
+    keys = []
+    for depth in (1, 2, 3):
+        params = worker.cache_params("DecisionTree", {"max_depth": depth})
+        keys.append(cache.make_key(dataset, "DecisionTree", params))
+        cache.store(db, keys[-1], dataset, "DecisionTree", params, run)
+    entry_size = db.query(models.TrainingCache).first().size_bytes
+
+    # Touch the oldest entry so the middle one becomes least recently used
+    assert cache.lookup(db, keys[0]) is not None
+    monkeypatch.setattr(cache, "CACHE_MAX_BYTES", entry_size * 3)
+    params = worker.cache_params("DecisionTree", {"max_depth": 4})
+    cache.store(db, cache.make_key(dataset, "DecisionTree", params), dataset, "DecisionTree", params, run)
+
+    db.expire_all()
+    remaining = {e.key for e in db.query(models.TrainingCache).all()}
+    assert keys[1] not in remaining
+    assert keys[0] in remaining and keys[2] in remaining
+    assert len(remaining) == 3
+
+def test_force_retrain_skips_cache(db, dataset, tmp_path, monkeypatch):
+    spawned = []
+    monkeypatch.setattr(main, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(worker, "train_background_task", lambda *args: spawned.append(args))
+    main.app.dependency_overrides[main.get_db] = lambda: db
+    try:
+        client = TestClient(main.app)
+        body = {"experiment_id": 1, "dataset_filename": "data.csv", "model": "DecisionTree", "params": {}}
+
+        miss = client.post("/jobs/start", json=body).json()
+        assert miss["status"] == "running" and len(spawned) == 1
+        cache.store(db, spawned[0][4], dataset, "DecisionTree", worker.cache_params("DecisionTree", {}),
+                    finished_run(db, {"final_accuracy": 0.7}, [(1, "test_accuracy", 0.7)]))
+
+        hit = client.post("/jobs/start", json=body).json()
+        assert hit["status"] == "completed" and "cached" in hit["tags"]
+        assert hit["metrics"] == {"final_accuracy": 0.7}
+        assert len(spawned) == 1
+
+        forced = client.post("/jobs/start", json={**body, "force_retrain": True}).json()
+        assert forced["status"] == "running" and "cached" not in forced["tags"]
+        assert len(spawned) == 2
+    finally:
+        main.app.dependency_overrides.clear()